@@ -3,7 +3,26 @@
 
 import logging
 import re
-from typing import Dict, Optional, Any
+from functools import lru_cache
+from typing import Dict, Optional, Any, Callable, List, Tuple
+
+def _is_ddmmyyyy(value: str) -> bool:
+    """
+    Equivalente a re.match(r'^\d{2}/\d{2}/\d{4}$', value) para valores
+    já 'strip'ados: checagem de tamanho fixo + posições das barras,
+    sem passar pelo motor de Regex.
+    """
+    return (len(value) == 10
+            and value[2] == "/" and value[5] == "/"
+            and (value[:2] + value[3:5] + value[6:]).isdecimal())
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compila (uma única vez) o 'pattern' de uma regra.
+    As regras vêm do ParserRepository e se repetem em todo o lote.
+    """
+    return re.compile(pattern)
 
 class ConfidenceCalculator:
     """
@@ -15,6 +34,11 @@ class ConfidenceCalculator:
     como um único item.
     """
 
+    def __init__(self):
+        # Planos de validação já compilados, por identidade do ruleset (ver _compile_plan).
+        # O ruleset fica guardado junto do plano: o id() não é reciclado enquanto ele viver.
+        self._plan_cache: Dict[int, Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any], Callable[[Optional[str]], bool]]]]] = {}
+
     def _validate_rule(self, value: Optional[str], rule: Dict[str, Any]) -> bool:
         """
         Executa uma regra de validação individual.
@@ -36,7 +60,7 @@ class ConfidenceCalculator:
                     return False
                 if "length" in rule and len(value) != rule["length"]:
                     return False
-                if "pattern" in rule and not re.match(rule["pattern"], value):
+                if "pattern" in rule and not _compile_pattern(rule["pattern"]).match(value):
                     return False
             
             elif rule_type == "integer":
@@ -47,7 +71,7 @@ class ConfidenceCalculator:
             
             elif rule_type == "date":
                 if "format" in rule and rule["format"] == "dd/mm/yyyy":
-                    if not re.match(r'^\d{2}/\d{2}/\d{4}$', value):
+                    if not _is_ddmmyyyy(value):
                         return False
             
             elif rule_type == "enum":
@@ -55,20 +79,100 @@ class ConfidenceCalculator:
                     return False
 
         except Exception as e:
-            logging.warning(f"CONF (V18.3): Erro ao processar regra '{rule}' para valor '{value}': {e}")
+            logging.warning("CONF (V18.3): Erro ao processar regra '%s' para valor '%s': %s", rule, value, e)
             return False
             
         return True # Passou em todas as validações
 
+    def _compile_rule(self, rule: Dict[str, Any]) -> Callable[[Optional[str]], bool]:
+        """
+        "Compila" uma regra em uma função especializada, equivalente a
+        _validate_rule(value, rule), mas que lê o dict da regra UMA vez:
+        só as checagens presentes na regra entram na lista 'checks'.
+        """
+        try:
+            is_nullable = rule.get("nullable", True)
+            rule_type = rule.get("type")
+            checks = []
+
+            if rule_type == "string":
+                if "min_length" in rule:
+                    min_length = rule["min_length"]
+                    checks.append(lambda v: len(v) >= min_length)
+                if "max_length" in rule:
+                    max_length = rule["max_length"]
+                    checks.append(lambda v: len(v) <= max_length)
+                if "length" in rule:
+                    length = rule["length"]
+                    checks.append(lambda v: len(v) == length)
+                if "pattern" in rule:
+                    pattern_match = _compile_pattern(rule["pattern"]).match
+                    checks.append(lambda v: pattern_match(v) is not None)
+
+            elif rule_type == "integer":
+                checks.append(str.isdigit)
+                if "minimum" in rule:
+                    minimum = rule["minimum"]
+                    checks.append(lambda v: int(v) >= minimum)
+
+            elif rule_type == "date":
+                if "format" in rule and rule["format"] == "dd/mm/yyyy":
+                    checks.append(_is_ddmmyyyy)
+
+            elif rule_type == "enum":
+                # frozenset montado uma vez: checagem O(1) por valor
+                values_lower = frozenset(v.lower() for v in rule.get("values", []))
+                checks.append(lambda v: v.lower().strip() in values_lower)
+
+        except Exception:
+            # Regra malformada (ex: Regex inválida): mantém o caminho
+            # interpretado, que registra o erro a cada validação.
+            return lambda value: self._validate_rule(value, rule)
+
+        def validator(value: Optional[str]) -> bool:
+            if not value:
+                return is_nullable
+            try:
+                for check in checks:
+                    if not check(value):
+                        return False
+            except Exception as e:
+                logging.warning("CONF (V18.3): Erro ao processar regra '%s' para valor '%s': %s", rule, value, e)
+                return False
+            return True
+
+        return validator
+
+    def _compile_plan(self, rules_to_validate: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any], Callable[[Optional[str]], bool]]]:
+        """
+        Compila o ruleset inteiro em uma lista (campo, regra, validador).
+        O ParserRepository devolve o MESMO dict de regras para um 'label'
+        em todo o lote, então o plano é memoizado pela identidade do
+        ruleset: uma consulta O(1), sem serializar as regras a cada item.
+        """
+        entry = self._plan_cache.get(id(rules_to_validate))
+        if entry is not None and entry[0] is rules_to_validate:
+            return entry[1]
+        plan = [
+            (field_name, rule, self._compile_rule(rule))
+            for field_name, rule in rules_to_validate.items()
+        ]
+        self._plan_cache[id(rules_to_validate)] = (rules_to_validate, plan)
+        return plan
+
     def calculate_confidence(self, 
                              extracted_data: Dict[str, Optional[str]], 
-                             validation_rules: Dict[str, Any]) -> float:
+                             validation_rules: Dict[str, Any],
+                             threshold: float = 0.0) -> float:
         """
         Calcula um score de confiança baseado nas regras V18.3.
         
         Args:
             extracted_data: Os dados retornados pelo Módulo 2 (ParserExecutor).
             validation_rules: O dict de regras (ex: {"nome": ..., "inscricao": ...}).
+            threshold: Limiar de decisão do chamador. Quando o score máximo
+                       ainda alcançável cai abaixo dele, a validação é
+                       interrompida (o score parcial já decide o Fallback).
                               
         Returns:
             Um score de 0.0 a 1.0.
@@ -95,21 +199,28 @@ class ConfidenceCalculator:
 
         total_fields_with_rules = len(rules_to_validate)
         validated_fields = 0
+        failed_fields = 0
         
         logging.info("Iniciando Módulo 3 (ConfidenceCalculator V18.3)...")
 
-        # Itera sobre as REGRAS, não sobre os dados
-        for field_name, rule in rules_to_validate.items():
-            value = extracted_data.get(field_name)
+        # Itera sobre as REGRAS (já compiladas), não sobre os dados
+        get_value = extracted_data.get
+        for field_name, rule, validator in self._compile_plan(rules_to_validate):
+            value = get_value(field_name)
             
-            if self._validate_rule(value, rule):
+            if validator(value):
                 validated_fields += 1
             else:
-                logging.warning(f"CONF (V18.3): Campo '{field_name}' falhou na validação. Valor: '{value}', Regra: {rule}")
+                # Formatação lazy: o dict da regra só vira string se o log for emitido
+                logging.warning("CONF (V18.3): Campo '%s' falhou na validação. Valor: '%s', Regra: %s", field_name, value, rule)
+                failed_fields += 1
+                if (total_fields_with_rules - failed_fields) / total_fields_with_rules < threshold:
+                    logging.info("CONF (V18.3): Score não pode mais atingir %.2f. Interrompendo validação.", threshold)
+                    break
 
         confidence_score = validated_fields / total_fields_with_rules
         
-        logging.info(f"Módulo 3 (V18.3): {validated_fields} de {total_fields_with_rules} campos VALIDADOS.")
-        logging.info(f"Módulo 3 (V18.3): Score de Confiança Final = {confidence_score:.2f}")
+        logging.info("Módulo 3 (V18.3): %d de %d campos VALIDADOS.", validated_fields, total_fields_with_rules)
+        logging.info("Módulo 3 (V18.3): Score de Confiança Final = %.2f", confidence_score)
         
         return confidence_score
\ No newline at end of file
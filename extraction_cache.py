@@ -0,0 +1,75 @@
+# Módulo: extraction_cache.py
+# (Cache de Extração LLM: endereçado por conteúdo, persistido em disco)
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+# Define o diretório padrão
+EXTRACTION_CACHE_DIR = "extraction_cache"
+
+# Versão do prompt de extração. Incrementar sempre que o prompt do
+# FallbackExtractor mudar, para invalidar as respostas antigas.
+PROMPT_VERSION = "v1"
+
+class ExtractionCache:
+    """
+    Cache persistente das respostas do LLM de extração (FallbackExtractor).
+
+    A chave é o SHA-256 de (modelo, versão do prompt, prompt completo).
+    Como o prompt já contém o schema e o texto do PDF, qualquer PDF
+    inalterado reexecutado com o mesmo schema vira uma leitura de disco
+    em vez de uma chamada ao LLM.
+    """
+
+    def __init__(self, cache_dir=EXTRACTION_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logging.debug(f"Cache de extração em: {self.cache_dir}")
+
+    def get_key(self, model: str, prompt: str) -> str:
+        """
+        Gera a chave do cache. Cada parte é prefixada pelo seu tamanho
+        para evitar colisões entre concatenações diferentes.
+        """
+        h = hashlib.sha256()
+        for part in (model, PROMPT_VERSION, prompt):
+            data = part.encode("utf-8")
+            h.update(len(data).to_bytes(8, "big"))
+            h.update(data)
+        return h.hexdigest()
+
+    def _get_filepath(self, key: str) -> str:
+        # Ex: 'extraction_cache/ab/ab12...ef.json'
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        filepath = self._get_filepath(key)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            logging.error(f"CORRUPÇÃO: Entrada de cache {key} mal formatada. Tratando como Cache Miss.")
+            return None
+        logging.info(f"CACHE DE EXTRAÇÃO HIT: {key[:12]}")
+        return data
+
+    def save(self, key: str, data: dict):
+        """
+        Grava de forma atômica (arquivo temporário + rename), para que
+        leitores concorrentes nunca vejam um JSON pela metade.
+        """
+        filepath = self._get_filepath(key)
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            logging.error(f"Falha ao salvar entrada de cache {key}: {e}")
@@ -1,12 +1,29 @@
-import os
 import json
+import time
 import logging
-from openai import OpenAI
-from dotenv import load_dotenv
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
+from openai import APITimeoutError
+from openai_client import get_openai_client, DEFAULT_TIMEOUT_SECONDS, DEFAULT_MAX_RETRIES
+from extraction_cache import ExtractionCache
 
-# Carrega as variáveis de ambiente (OPENAI_API_KEY)
-load_dotenv()
+# Chamadas com prazo ('timeout') rodam neste pool: quem chama espera no
+# máximo o prazo em relógio de parede, qualquer que seja a fase do httpx.
+# A própria requisição também é encerrada no prazo (streaming fechado ao
+# estourar, ver _request_llm): o worker se libera logo depois, sem deixar
+# chamadas órfãs ocupando o pool.
+_DEADLINE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+
+def _timeout_por_fase(budget: float) -> httpx.Timeout:
+    """
+    O timeout do httpx vale por fase (connect, write, cada read, pool),
+    não para a chamada inteira. As fases curtas ficam com uma fração do
+    prazo; a leitura (a espera por cada pedaço da resposta) fica com o
+    prazo todo. O total é garantido pelo deadline checado no streaming.
+    """
+    return httpx.Timeout(connect=budget * 0.2, write=budget * 0.1,
+                         pool=budget * 0.1, read=budget)
 
 class FallbackExtractor:
     """
@@ -16,14 +33,14 @@ class FallbackExtractor:
     quando o "Caminho Rápido" (Módulos 1/2/3) falha.
     """
     
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            logging.error("OPENAI_API_KEY não encontrada. Verifique seu arquivo .env")
-            raise ValueError("API key da OpenAI não configurada.")
-            
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        # Cliente (e pool de conexões HTTP) compartilhado entre os módulos,
+        # com prazo e retentativas limitados para cada requisição
+        self.client = get_openai_client().with_options(timeout=timeout, max_retries=max_retries)
         self.model = "gpt-5-mini" # O modelo do desafio [cite: 76]
+        self.cache = ExtractionCache()
         
     def _build_extraction_prompt(self, 
                                  schema_to_extract: dict, 
@@ -87,32 +104,113 @@ class FallbackExtractor:
 
         return prompt_template.strip()
 
-    def _call_llm_extractor(self, prompt: str) -> Optional[dict]:
+    def _resposta_cacheavel(self, data: dict, schema: dict) -> bool:
+        """
+        Só vai para o ExtractionCache (permanente) uma resposta que cobre
+        todos os campos pedidos e traz pelo menos um valor preenchido:
+        um '{}' ou uma resposta toda nula envenenaria a chave para sempre.
+        """
+        return (bool(data)
+                and all(k in data for k in schema)
+                and any(data[k] for k in schema))
+
+    def _request_llm(self, client, prompt: str, schema: dict, cache_key: str,
+                     deadline: Optional[float] = None) -> Optional[dict]:
+        """
+        Requisição ao LLM + parse + ExtractionCache.
+        As exceções sobem para _call_llm_extractor.
+
+        Com 'deadline' (time.monotonic()), a resposta vem em streaming e o
+        prazo é conferido a cada pedaço: ao estourar, a conexão é fechada
+        (o modelo para de gerar e a chamada não segue consumindo tokens)
+        e levanta TimeoutError.
+        """
+        messages = [
+            {"role": "system", "content": "Você é um assistente de extração de dados que responde apenas com JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        if deadline is None:
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"}, 
+                # temperature=0.0
+            )
+            response_content = response.choices[0].message.content
+        else:
+            stream = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            partes = []
+            try:
+                for chunk in stream:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError("Prazo da chamada ao LLM estourado durante a resposta.")
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        partes.append(chunk.choices[0].delta.content)
+            finally:
+                stream.close() # Encerra a requisição (inclusive ao estourar o prazo)
+            response_content = "".join(partes)
+
+        extracted_data = json.loads(response_content)
+        if not isinstance(extracted_data, dict):
+            logging.error(f"Fallback: Resposta do LLM não é um objeto JSON ({type(extracted_data).__name__}).")
+            return None
+        logging.info("Fallback: Extração de dados via LLM concluída.")
+        if self._resposta_cacheavel(extracted_data, schema):
+            # Só os campos do schema: o Cache Hit é revalidado contra ele
+            self.cache.save(cache_key, {k: extracted_data[k] for k in schema})
+        else:
+            logging.warning("Fallback: Resposta incompleta ou vazia. Não será guardada no cache de extração.")
+        return extracted_data
+
+    def _call_llm_extractor(self, prompt: str, schema: dict, timeout: Optional[float] = None) -> Optional[dict]:
         """
         MÉTODO PRIVADO (O "Trabalhador da API")
         
         Sua única função é chamar a API da OpenAI.
         Nós o separamos para que 'extract_all' e 'extract_missing'
         possam ambos usá-lo sem duplicar o código try/except.
+
+        O prompt já contém o schema e o texto do PDF, então ele é a
+        chave do ExtractionCache: reexecuções sobre PDFs inalterados
+        não voltam ao LLM. Um Cache Hit só é usado se as suas chaves
+        pertencem ao 'schema' pedido.
+
+        Com 'timeout', o prazo é repartido entre as fases do httpx (sem
+        retentativas), a própria requisição é encerrada no prazo e a espera
+        de quem chama é limitada em relógio de parede. Ao estourar, levanta
+        APITimeoutError (fase do httpx) ou TimeoutError (prazo): quem chama
+        decide o que fazer.
         """
+        cache_key = self.cache.get_key(self.model, prompt)
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            if isinstance(cached_data, dict) and cached_data.keys() <= schema.keys():
+                logging.info("Fallback: Resposta recuperada do cache de extração (sem chamada ao LLM).")
+                return cached_data
+            logging.warning("Fallback: Entrada do cache de extração não corresponde ao schema. Ignorando.")
+
         try:
             logging.info(f"Acionando Fallback: Chamando {self.model} para extração direta...")
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um assistente de extração de dados que responde apenas com JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}, 
-                # temperature=0.0
-            )
-            
-            response_content = response.choices[0].message.content
-            extracted_data = json.loads(response_content)
-            logging.info("Fallback: Extração de dados via LLM concluída.")
-            return extracted_data
+            if timeout is None:
+                return self._request_llm(self.client, prompt, schema, cache_key)
+
+            # Mesmo cliente/pool HTTP, só com outras opções de requisição
+            deadline = time.monotonic() + timeout
+            client = self.client.with_options(timeout=_timeout_por_fase(timeout), max_retries=0)
+            futuro = _DEADLINE_POOL.submit(self._request_llm, client, prompt, schema, cache_key, deadline)
+            return futuro.result(timeout=max(0.0, deadline - time.monotonic()))
             
+        except (APITimeoutError, TimeoutError):
+            if timeout is not None:
+                raise
+            logging.error("Fallback: Timeout ao chamar a API OpenAI.")
+            return None
         except Exception as e:
             logging.error(f"Fallback: Erro ao chamar a API OpenAI: {e}")
             return None
@@ -123,15 +221,18 @@ class FallbackExtractor:
         """
         logging.warning("Fallback: Acionado para extração completa.")
         prompt = self._build_extraction_prompt(schema, pdf_text)
-        return self._call_llm_extractor(prompt)
+        return self._call_llm_extractor(prompt, schema)
 
     def extract_missing(self, 
                         missing_schema: dict, 
                         pdf_text: str, 
-                        partial_data: dict) -> Optional[dict]:
+                        partial_data: dict,
+                        timeout: Optional[float] = None) -> Optional[dict]:
         """
         Cenário de Falha Parcial: Extrai APENAS os campos faltantes.
+        'timeout' (segundos) limita a chamada ao LLM; ao estourar,
+        levanta openai.APITimeoutError ou TimeoutError.
         """
         logging.warning(f"Fallback: Acionado para campos faltantes: {list(missing_schema.keys())}")
         prompt = self._build_extraction_prompt(missing_schema, pdf_text, partial_data)
-        return self._call_llm_extractor(prompt)
\ No newline at end of file
+        return self._call_llm_extractor(prompt, missing_schema, timeout=timeout)
\ No newline at end of file
@@ -3,7 +3,67 @@
 
 import re
 import logging
-from typing import Dict, Optional, List
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
+
+# Palavras de parada removidas das descrições do schema
+_STOPWORDS = frozenset({"do", "da", "de", "o", "a", "para", "com", "sem"})
+
+@lru_cache(maxsize=2048)
+def _keywords_from_description(description: str) -> Tuple[str, ...]:
+    """
+    Versão memoizada de HeuristicExtractor._get_keywords_from_description.
+    Retorna uma tupla (imutável) porque o resultado é compartilhado entre chamadas.
+    """
+    # Remove palavras de parada comuns (stopwords)
+    palavras_limpas = [p for p in description.lower().split() if p not in _STOPWORDS]
+
+    # Gera n-gramas (ex: "número de inscrição")
+    keywords = []
+    if len(palavras_limpas) > 1:
+        keywords.append(" ".join(palavras_limpas[:3])) # "número de inscrição"
+        keywords.append(" ".join(palavras_limpas[:2])) # "número de" (menos útil)
+    if palavras_limpas:
+        keywords.append(palavras_limpas[0]) # "número"
+
+    # Remove duplicatas e prioriza os mais longos
+    return tuple(sorted(set(keywords), key=len, reverse=True))
+
+def _fold_case(text: str) -> str:
+    """
+    Normaliza caixa de forma compatível com o (?i) do módulo 're' para
+    letras latinas: casefold() + 'i' pontuado/sem ponto unificados em 'i'.
+    Se uma Regex (?i) casa um literal no texto, o literal dobrado também
+    aparece no texto dobrado (o contrário não é garantido, e não precisa ser).
+    """
+    return text.casefold().replace("i\u0307", "i").replace("\u0131", "i")
+
+def _is_prefilter_token(token: str) -> bool:
+    # Só tokens de letras latinas/dígitos/'_' têm a equivalência garantida
+    return bool(token) and all((c.isalnum() and ord(c) < 0x250) or c == "_" for c in token)
+
+@lru_cache(maxsize=8192)
+def _escape_kw(keyword: str) -> str:
+    """
+    Escapa uma palavra-chave para a Regex; espaços viram "[\\s_]+".
+    Palavras como "data" e "numero" se repetem entre campos e schemas.
+    """
+    return re.escape(keyword).replace(r"\ ", r"[\s_]+")
+
+@lru_cache(maxsize=2048)
+def _classify_field(field_name: str) -> str:
+    """
+    Tipo do campo pela chave: "num", "date" ou "generic".
+    Define o grupo de captura da Regex (ver _generate_smart_regex).
+    """
+    if any(kw in field_name for kw in ("inscricao", "numero", "cep", "id")):
+        return "num"
+    if any(kw in field_name for kw in ("data", "date")):
+        return "date"
+    return "generic"
+
+# Grupo de captura de datas (dd/mm/aaaa), reaproveitado pelos campos de data
+_DATE_TAIL = r"(\d{2}/\d{2}/\d{4})"
 
 class HeuristicExtractor:
     """
@@ -18,34 +78,26 @@ class HeuristicExtractor:
     O objetivo ainda é garantir o tempo de < 10s, mas com
     uma acurácia "aceitável" para o Caminho Lento.
     """
+
+    def __init__(self):
+        # Regex já compiladas, por (campo, descrição). O schema de um
+        # 'label' se repete em todo o lote, então cada campo compila uma vez.
+        self._compiled_patterns: Dict[Tuple[str, str], re.Pattern] = {}
+        # Tokens de pré-filtro por (campo, descrição); None = sem pré-filtro
+        self._presence_tokens: Dict[Tuple[str, str], Optional[Tuple[str, ...]]] = {}
     
     def _get_keywords_from_description(self, description: str) -> List[str]:
         """
         Extrai palavras-chave da descrição do schema.
         Ex: "Número de inscrição do profissional" -> ["Número de inscrição", "inscrição"]
         """
-        # Remove palavras de parada comuns (stopwords)
-        description = description.lower()
-        stopwords = {"do", "da", "de", "o", "a", "para", "com", "sem"}
-        palavras_limpas = [p for p in re.split(r'\s+', description) if p not in stopwords]
-        
-        # Gera n-gramas (ex: "número de inscrição")
-        keywords = []
-        if len(palavras_limpas) > 1:
-            keywords.append(" ".join(palavras_limpas[:3])) # "número de inscrição"
-            keywords.append(" ".join(palavras_limpas[:2])) # "número de" (menos útil)
-        if palavras_limpas:
-            keywords.append(palavras_limpas[0]) # "número"
-        
-        # Remove duplicatas e prioriza os mais longos
-        keywords = sorted(list(set(keywords)), key=len, reverse=True)
-        return keywords
+        return list(_keywords_from_description(description))
 
-    def _generate_smart_regex(self, field_name: str, description: str) -> str:
+    def _get_field_keywords(self, field_name: str, description: str) -> List[str]:
         """
-        Gera uma Regex heurística (V18.3) baseada na descrição E na chave.
+        Palavras-chave (V18.3) de um campo, em ordem de prioridade:
+        as da descrição e depois as derivadas da chave.
         """
-        
         keywords = []
         
         # 1. Palavras-chave da Descrição (Sua ideia)
@@ -65,24 +117,87 @@ class HeuristicExtractor:
         for k in keywords:
             if k not in keywords_unicas:
                 keywords_unicas.append(k)
+        return keywords_unicas
+
+    def _generate_smart_regex(self, field_name: str, description: str) -> str:
+        """
+        Gera uma Regex heurística (V18.3) baseada na descrição E na chave.
+        """
+        keywords_unicas = self._get_field_keywords(field_name, description)
         
         # 5. Constrói o Padrão de Busca (ex: "Número de inscrição" OU "inscrição")
         # Escapa caracteres de Regex
-        patterns_escaped = [re.escape(k).replace(r"\ ", r"[\s_]+") for k in keywords_unicas]
+        patterns_escaped = [_escape_kw(k) for k in keywords_unicas]
         pattern_str = "|".join(patterns_escaped)
 
         # 6. Constrói a Regex Final
+        field_type = _classify_field(field_name)
+
         # Tenta capturar um valor numérico se a chave/descrição sugerir
-        if any(kw in field_name for kw in ["inscricao", "numero", "cep", "id"]):
+        if field_type == "num":
             # Regex mais restritiva para números
-            return f"(?i)(?:{pattern_str})\s*[:\\-]?\s*([0-9.,\\-/]+)"
+            return rf"(?i)(?:{pattern_str})\s*[:\-]?\s*([0-9.,\-/]+)"
         
         # Tenta capturar uma data
-        if any(kw in field_name for kw in ["data", "date"]):
-             return f"(?i)(?:{pattern_str})\s*[:\\-]?\s*(\d{2}/\d{2}/\d{4})"
+        # (antes, o f-string sem 'r' transformava '\d{2}' em '\d2' e a Regex nunca casava)
+        if field_type == "date":
+             return rf"(?i)(?:{pattern_str})\s*[:\-]?\s*" + _DATE_TAIL
 
         # Regex genérica (default): captura o resto da linha
-        return f"(?i)(?:{pattern_str})\s*[:\\-]?\s*([^\n\r]+)"
+        return rf"(?i)(?:{pattern_str})\s*[:\-]?\s*([^\n\r]+)"
+
+    def _get_compiled_regex(self, field_name: str, description: str) -> re.Pattern:
+        """
+        Retorna a Regex V18.3 do campo já compilada (gera e compila só na primeira vez).
+        """
+        key = (field_name, description)
+        pattern = self._compiled_patterns.get(key)
+        if pattern is None:
+            pattern = re.compile(self._generate_smart_regex(field_name, description))
+            self._compiled_patterns[key] = pattern
+        return pattern
+
+    def _get_presence_tokens(self, field_name: str, description: str) -> Optional[Tuple[str, ...]]:
+        """
+        Primeiro token (dobrado) de cada palavra-chave do campo.
+        A Regex só pode casar se ao menos um deles estiver no texto, então
+        a busca pode ser pulada quando nenhum aparece. Retorna None quando
+        algum token não é seguro para a comparação (aí a Regex sempre roda).
+        """
+        key = (field_name, description)
+        if key in self._presence_tokens:
+            return self._presence_tokens[key]
+
+        tokens = []
+        for keyword in self._get_field_keywords(field_name, description):
+            token = keyword.split(" ", 1)[0]
+            if not _is_prefilter_token(token):
+                tokens = None
+                break
+            folded = _fold_case(token)
+            if folded not in tokens:
+                tokens.append(folded)
+
+        result = tuple(tokens) if tokens else None
+        self._presence_tokens[key] = result
+        return result
+
+    def precompile(self, schema: Dict[str, str]) -> int:
+        """
+        Aquece o cache de Regex para um schema (ex: os schemas mesclados
+        do Pré-Scan), tirando a compilação do caminho de cada PDF.
+        Retorna quantas Regex ficaram prontas.
+        """
+        compiled = 0
+        for field_name, field_description in schema.items():
+            try:
+                self._get_compiled_regex(field_name, field_description or "")
+                self._get_presence_tokens(field_name, field_description or "")
+                compiled += 1
+            except re.error as e:
+                # O erro volta a ser registrado (e o campo anulado) no extract()
+                logging.warning(f"HEURÍSTICA (V18.3): Regex inválida para '{field_name}' no pré-aquecimento: {e}")
+        return compiled
 
     def extract(self, pdf_text: str, schema: Dict[str, str]) -> Dict[str, Optional[str]]:
         """
@@ -91,13 +206,25 @@ class HeuristicExtractor:
         extracted_data = {}
         logging.info("Acionando Módulo de Fallback Local (Heurístico V18.3 - Inteligente)...")
 
+        # Texto dobrado para o pré-filtro (calculado uma vez, só se usado)
+        folded_text = None
+
         for field_name, field_description in schema.items():
             
-            # Gera a Regex V18.3 usando a descrição
-            regex_pattern = self._generate_smart_regex(field_name, field_description or "")
-            
             try:
-                match = re.search(regex_pattern, pdf_text)
+                # Regex V18.3 (baseada na descrição), compilada uma única vez
+                pattern = self._get_compiled_regex(field_name, field_description or "")
+
+                # Pré-filtro: nenhuma palavra-chave no texto => a Regex não casa
+                tokens = self._get_presence_tokens(field_name, field_description or "")
+                if tokens is not None:
+                    if folded_text is None:
+                        folded_text = _fold_case(pdf_text)
+                    if not any(token in folded_text for token in tokens):
+                        extracted_data[field_name] = None
+                        continue
+
+                match = pattern.search(pdf_text)
                 
                 if match:
                     value = match.group(1)
@@ -4,10 +4,26 @@
 import logging
 import json 
 import os
+import atexit
+import hashlib
 import threading
 import time
 import fitz 
-from queue import Queue
+from openai import APITimeoutError
+import stat
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait
+
+try:
+    import orjson # Opcional: parse do dataset em C
+except ImportError:
+    orjson = None
+
+try:
+    import pypdfium2 as pdfium # Opcional: backend alternativo de texto (USE_PDFIUM=1)
+except ImportError:
+    pdfium = None
 
 # --- Importando todos os nossos Módulos V18.2 ---
 from parser_repository import ParserRepository         # (V16 - Mantido)
@@ -17,6 +33,7 @@ from parser_executor import ParserExecutor             # (V16 - Mantido)
 from confidence_calculator import ConfidenceCalculator # (V18 - Mantido)
 from fallback_extractor import FallbackExtractor       # (V16 - Mantido)
 from heuristic_extractor import HeuristicExtractor     # (V18.1 - Mantido)
+from pdf_text_cache import PdfTextCache
 
 # Configuração inicial de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,23 +43,61 @@ MIN_CONFIDENCE_THRESHOLD = 0.8
 
 HEURISTIC_FAILURE_THRESHOLD = 0.7 # Aciona LLM se 50% ou mais dos campos forem null
 
-LLM_TIMEOUT_SECONDS = 9.9 # Nosso timeout global
+LLM_TIMEOUT_SECONDS = 9.9 # Nosso timeout global (deadline de cada item)
+
+ITEM_TIME_LIMIT_SECONDS = 10.0 # Requisito de tempo do desafio, por item
+
+PDF_DIR = Path("files") # Diretório base dos PDFs do dataset (resolvido uma vez)
+
+# Backend de extração de texto: PyMuPDF (padrão) ou pypdfium2, se USE_PDFIUM=1.
+# O texto dos dois difere em detalhes (espaços/quebras): os parsers salvos
+# foram gerados sobre o texto do backend com que o repositório foi montado.
+USE_PDFIUM = os.environ.get("USE_PDFIUM", "").strip().lower() in {"1", "true", "yes"}
+if USE_PDFIUM and pdfium is None:
+    logging.warning("USE_PDFIUM definido, mas o pypdfium2 não está instalado. Usando PyMuPDF.")
+    USE_PDFIUM = False
+PDF_TEXT_BACKEND = "pdfium" if USE_PDFIUM else "fitz"
+
+# Itens do lote processados em paralelo (I/O de disco, Regex e chamadas LLM).
+# Pool compacto: um slot por chamada LLM concorrente (o gargalo é a rede)
+BATCH_MAX_WORKERS = 4
+
+# O PyMuPDF (fitz) não é thread-safe: a extração de texto é serializada
+# (o mesmo vale para o pypdfium2, que usa este mesmo lock)
+_FITZ_LOCK = threading.Lock()
+
+# Protege a lista GEN_FUTURES entre as threads do lote
+# (o "checa e cria" do lock de geração é atômico em REPO.try_acquire_lock)
+_GENERATION_LOCK = threading.Lock()
 
-def _run_llm_extract_missing_in_thread(queue: Queue, 
-                                       missing_schema: dict, 
-                                       pdf_text: str, 
-                                       partial_data: dict):
+# Pool persistente das tarefas de geração de parser (background).
+# Limita a concorrência das gerações em lotes frios (pool compacto de 3).
+GEN_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="gen")
+atexit.register(GEN_POOL.shutdown, wait=True) # Encerramento explícito ao sair
+GEN_FUTURES: list[Future] = [] # Tarefas submetidas (protegido por _GENERATION_LOCK)
+
+class _Lazy:
     """
-    Executa o 'extract_missing' (Modo 2) em uma thread
-    para podermos aplicar o timeout.
+    Proxy de singleton construído só no primeiro uso (ex: FALLBACK.extract_all).
+    Um lote só com Cache Hit nunca cria os módulos que dependem do LLM.
     """
-    try:
-        # FALLBACK é o nosso singleton FallbackExtractor
-        result = FALLBACK.extract_missing(missing_schema, pdf_text, partial_data)
-        queue.put(result)
-    except Exception as e:
-        logging.error(f"THREAD LLM (extract_missing) FALHOU: {e}")
-        queue.put(None) # Sinaliza falha
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock: # Várias threads do lote podem chegar juntas
+                if self._instance is None:
+                    logging.info(f"Carregando módulo sob demanda: {self._factory.__name__}...")
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
 
 # --- CARREGAMENTO SINGLETON DOS MÓDULOS ---
 try:
@@ -50,9 +105,10 @@ try:
     REPO = ParserRepository()
     EXECUTOR = ParserExecutor()
     CALCULATOR = ConfidenceCalculator()
-    FALLBACK = FallbackExtractor()
+    FALLBACK = _Lazy(FallbackExtractor) # (LLM: carregado no primeiro uso)
     HEURISTIC_FALLBACK = HeuristicExtractor()
-    PARSER_GENERATOR = ParserGenerator() 
+    PDF_TEXT_CACHE = PdfTextCache()
+    PARSER_GENERATOR = _Lazy(ParserGenerator) # (LLM: carregado no primeiro uso)
     VALIDATION_GENERATOR = ValidationGenerator()
     logging.info("Módulos V18.2 carregados.")
 except Exception as e:
@@ -60,18 +116,84 @@ except Exception as e:
     exit(1)
 # ----------------------------------------
 
+def _extrair_texto_pdfium(full_path: Path) -> str:
+    """
+    Extração por intervalo (get_text_range) com o pypdfium2.
+    As quebras de linha do PDFium (CRLF) são normalizadas para LF e cada
+    página termina em quebra de linha, como no texto do PyMuPDF: sem isso
+    a última linha de uma página se juntaria à primeira da seguinte.
+    """
+    pdf = pdfium.PdfDocument(full_path)
+    try:
+        partes = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            texto_pagina = textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+            textpage.close()
+            page.close()
+            if texto_pagina and not texto_pagina.endswith("\n"):
+                texto_pagina += "\n"
+            partes.append(texto_pagina)
+        return "".join(partes)
+    finally:
+        pdf.close()
+
 def ler_texto_do_pdf(pdf_path: str) -> str | None:
-    """ Extrai o texto de um arquivo PDF (Mantido). """
-    full_path = os.path.join("files", pdf_path)
-    if not os.path.exists(full_path):
+    """
+    Extrai o texto de um arquivo PDF.
+    Consulta antes o PDF_TEXT_CACHE, chaveado por (caminho, mtime, tamanho, backend).
+    """
+    full_path = PDF_DIR / pdf_path
+    try:
+        st = full_path.stat() # Um único stat: existência + chave do cache
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         logging.error(f"Arquivo PDF não encontrado em: {full_path}")
         return None
+
+    cache_key = PDF_TEXT_CACHE.get_key(str(full_path), st.st_mtime_ns, st.st_size, PDF_TEXT_BACKEND)
+    texto = PDF_TEXT_CACHE.get(cache_key)
+    if texto is not None:
+        return texto
+
     try:
-        with fitz.open(full_path) as doc:
-            return "".join(page.get_text() for page in doc)
+        with _FITZ_LOCK:
+            if USE_PDFIUM:
+                texto = _extrair_texto_pdfium(full_path)
+            else:
+                with fitz.open(full_path) as doc:
+                    # Modo "text" sem reordenação de blocos: a ordem do content stream
+                    # basta para as Regex (sort=True custaria uma ordenação por página)
+                    texto = "".join(page.get_text("text", sort=False) for page in doc)
     except Exception as e:
         logging.error(f"Falha ao ler o PDF {full_path}: {e}")
         return None
+    PDF_TEXT_CACHE.save(cache_key, texto)
+    return texto
+
+def _chave_do_job(pdf_path: str, label: str, schema: dict) -> str | None:
+    """
+    Chave de deduplicação de um item do lote: (sha256 do PDF, label, schema).
+    O PDF é lido em blocos pelo hashlib.file_digest, sem carregar o arquivo inteiro.
+    """
+    if not (pdf_path and label and schema):
+        return None
+    try:
+        with open(PDF_DIR / pdf_path, "rb") as f:
+            pdf_hash = hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None # O erro de leitura é reportado por ler_texto_do_pdf
+    return f"{pdf_hash}|{label}|{json.dumps(schema, sort_keys=True, ensure_ascii=False)}"
+
+def _preparar_item(item: dict) -> tuple[str | None, str | None]:
+    """
+    Todo o I/O de disco de um item (hash para deduplicação + texto do PDF).
+    """
+    pdf_path = item.get("pdf_path")
+    job_key = _chave_do_job(pdf_path, item.get("label"), item.get("extraction_schema"))
+    pdf_text = ler_texto_do_pdf(pdf_path) if pdf_path else None
+    return job_key, pdf_text
 
 def _run_parser_generation_task(label: str, 
                                 schema_completo: dict, 
@@ -87,32 +209,38 @@ def _run_parser_generation_task(label: str,
         
         # --- CHAMADA 1: OBTER O GABARITO ---
         logging.info(f"[BACKGROUND] (1/3) Obtendo 'gabarito' via FallbackExtractor...")
+        inicio_etapa = time.time()
         gabarito = FALLBACK.extract_all(schema_completo, seed_pdf_text)
         
         if not gabarito:
-            logging.error(f"[BACKGROUND] Falha ao obter gabarito. Abortando geração.")
+            logging.error(f"[BACKGROUND] Falha ao obter gabarito após {time.time() - inicio_etapa:.2f}s. Abortando geração.")
             return
+        logging.info(f"[BACKGROUND] (1/3) Gabarito obtido em {time.time() - inicio_etapa:.2f}s.")
 
         # --- CHAMADA 2: GERAR O PARSER ---
         logging.info(f"[BACKGROUND] (2/3) Gerando 'parser' via ParserGenerator...")
+        inicio_etapa = time.time()
         parser_rules = PARSER_GENERATOR.generate_parser(
             schema=schema_completo,
             pdf_text=seed_pdf_text,
             correct_json_example=gabarito
         )
         if not parser_rules:
-            logging.error(f"[BACKGROUND] Falha ao gerar parser. Abortando geração.")
+            logging.error(f"[BACKGROUND] Falha ao gerar parser após {time.time() - inicio_etapa:.2f}s. Abortando geração.")
             return
+        logging.info(f"[BACKGROUND] (2/3) Parser gerado em {time.time() - inicio_etapa:.2f}s.")
 
         # --- CHAMADA 3: GERAR AS REGRAS ---
         logging.info(f"[BACKGROUND] (3/3) Gerando 'validation_rules' via ValidationGenerator...")
+        inicio_etapa = time.time()
         validation_rules = VALIDATION_GENERATOR.generate_rules(
             schema=schema_completo,
             correct_json_example=gabarito
         )
         if not validation_rules:
-            logging.error(f"[BACKGROUND] Falha ao gerar validation_rules. Abortando geração.")
+            logging.error(f"[BACKGROUND] Falha ao gerar validation_rules após {time.time() - inicio_etapa:.2f}s. Abortando geração.")
             return
+        logging.info(f"[BACKGROUND] (3/3) Regras geradas em {time.time() - inicio_etapa:.2f}s.")
 
         # --- SUCESSO: Combinar e Salvar o Pacote ---
         new_bundle = {
@@ -121,6 +249,7 @@ def _run_parser_generation_task(label: str,
         }
         
         REPO.save_parser(label, new_bundle)
+        EXECUTOR.compile(parser_rules) # Aquece: o primeiro Cache Hit já o encontra compilado
         logging.info(f"[BACKGROUND] TAREFA CONCLÍDA: Novo pacote V18.2 para '{label}' salvo.")
     
     except Exception as e:
@@ -133,15 +262,14 @@ def _run_parser_generation_task(label: str,
 def pre_scan_e_mesclar_schemas(batch_data: list) -> dict:
     """ (Mantido da V16) """
     logging.info("--- FASE 1: Pré-Scan e Mesclagem de Schemas ---")
-    merged_schemas_map = {}
+    merged = defaultdict(dict)
     for item in batch_data:
         label = item.get("label")
         schema = item.get("extraction_schema")
         if label and schema:
-            if label not in merged_schemas_map:
-                merged_schemas_map[label] = schema.copy()
-            else:
-                merged_schemas_map[label].update(schema)
+            merged[label] |= schema # (o dict novo já é uma cópia)
+    # dict comum: um label ausente deve dar KeyError, não um schema vazio
+    merged_schemas_map = dict(merged)
     logging.info(f"Pré-Scan concluído. {len(merged_schemas_map)} schemas únicos mesclados.")
     return merged_schemas_map
 
@@ -152,8 +280,7 @@ def processar_extracao(label: str,
                        item_schema: dict, 
                        pdf_text: str,
                        merged_schemas_map: dict,
-                       item_index: int, 
-                       batch_start_time: float
+                       item_start_time: float
                        ) -> tuple[dict, float]:
     """
     Orquestrador V21.2 (Heuristic-First Síncrono)
@@ -162,13 +289,14 @@ def processar_extracao(label: str,
     e pode acionar o LLM 'extract_missing' síncronamente.
     """
     logging.info(f"Iniciando processamento (V21.2) para o label: {label}")
-    start_time_item = time.time() # Início do processamento deste item
+    start_time_item = item_start_time # Início deste item (inclui a leitura do PDF)
     
     bundle = REPO.get_parser(label)
 
-    # --- CÁLCULO DE TIMEOUT CUMULATIVO (Definido antecipadamente) ---
-    # O orçamento de tempo total para ESTE item é (item_index + 1) * 10.0 segundos.
-    absolute_deadline = batch_start_time + (item_index + 1) * 10.0
+    # --- CÁLCULO DE TIMEOUT POR ITEM (Definido antecipadamente) ---
+    # Os itens rodam em paralelo (não há mais uma linha do tempo serial
+    # para acumular): cada item tem o seu próprio deadline.
+    absolute_deadline = item_start_time + LLM_TIMEOUT_SECONDS
     
     # O tempo restante que temos é o deadline menos o tempo atual
     current_time = time.time()
@@ -189,41 +317,42 @@ def processar_extracao(label: str,
         
         extracted_data = EXECUTOR.execute_parser(parser_rules, pdf_text)
         
-        logging.info("--- DADOS EXTRAÍDOS (Resultado Módulo 2) ---")
-        logging.info(json.dumps(extracted_data, indent=2, ensure_ascii=False))
-
-        confidence = CALCULATOR.calculate_confidence(extracted_data, validation_rules)
+        # Dump detalhado só em DEBUG: o json.dumps indentado roda a cada item
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("--- DADOS EXTRAÍDOS (Resultado Módulo 2) ---")
+            logging.debug(json.dumps(extracted_data, indent=2, ensure_ascii=False))
+
+        # Uma única passada pelo schema: dados finais + campos faltantes
+        final_data = {}
+        campos_faltantes = {}
+        for k, v in item_schema.items():
+            val = extracted_data.get(k)
+            final_data[k] = val
+            if not val:
+                campos_faltantes[k] = v
+
+        # Parser preencheu todos os campos: qualquer que fosse a confiança,
+        # o resultado seria o mesmo (não há o que pedir ao Fallback).
+        if not campos_faltantes:
+            logging.info("Parser preencheu todos os campos. Retornando dados do Parser (sem Módulo 3).")
+            return final_data, (time.time() - start_time_item)
 
-        final_data = {
-            k: extracted_data.get(k) for k in item_schema.keys()
-        }
+        confidence = CALCULATOR.calculate_confidence(
+            extracted_data, validation_rules, threshold=MIN_CONFIDENCE_THRESHOLD
+        )
 
         if confidence >= MIN_CONFIDENCE_THRESHOLD:
             logging.info(f"Confiança Alta ({confidence:.2f}). Retornando dados do Parser.")
             return final_data, (time.time() - start_time_item)
         else:
-            # MÓDULO 4 (V21.2) - Fallback Otimizado com WATCHDOG CUMULATIVO
+            # MÓDULO 4 (V21.2) - Fallback Otimizado com WATCHDOG POR ITEM
             logging.warning(f"Confiança Baixa ({confidence:.2f}). Acionando Fallback Otimizado (Modo 2)...")
-            
-            campos_faltantes = {
-                k: v for k, v in item_schema.items() 
-                if k not in final_data or not final_data[k]
-            }
-            if not campos_faltantes:
-                 return final_data, (time.time() - start_time_item)
-
-            q = Queue()
-            llm_thread = threading.Thread(
-                target=_run_llm_extract_missing_in_thread,
-                args=(q, campos_faltantes, pdf_text, final_data)
-            )
-            
-            llm_thread.start()
-            
+
             try:
-                logging.info(f"Tentando extração LLM 'missing' (Cache Hit) com timeout CUMULATIVO de {timeout_budget:.2f}s...")
-                fallback_data = q.get(timeout=timeout_budget)
-                llm_thread.join()
+                logging.info(f"Tentando extração LLM 'missing' (Cache Hit) com timeout de {timeout_budget:.2f}s...")
+                # O prazo é repartido entre as fases do httpx e a espera é
+                # limitada em relógio de parede (o item não passa do budget)
+                fallback_data = FALLBACK.extract_missing(campos_faltantes, pdf_text, final_data, timeout=timeout_budget)
                 
                 if fallback_data:
                     logging.info("Sucesso no Fallback LLM (Modo 2).")
@@ -231,8 +360,10 @@ def processar_extracao(label: str,
                 else:
                     logging.warning("Fallback LLM (Modo 2) falhou. Retornando dados parciais.")
                     
-            except: # (Timeout)
-                logging.critical(f"TIMEOUT CUMULATIVO DE {timeout_budget:.2f}s ATINGIDO no Modo 2! Retornando dados parciais.")
+            except (APITimeoutError, TimeoutError):
+                logging.critical(f"TIMEOUT DE {timeout_budget:.2f}s ATINGIDO no Modo 2! Retornando dados parciais.")
+            except Exception as e:
+                logging.error(f"Fallback LLM (Modo 2) FALHOU: {e}. Retornando dados parciais.")
             
             return final_data, (time.time() - start_time_item)
     
@@ -245,22 +376,25 @@ def processar_extracao(label: str,
         
         # 2. Inicia a Geração de Conhecimento (Background)
         # (Isto não mudou, ainda queremos acumular conhecimento)
-        if not REPO.is_generation_locked(label):
-            logging.info(f"Disparando thread de geração de pacote V21 (Híbrido)...")
-            REPO.create_lock(label)
-            generation_thread = threading.Thread(
-                target=_run_parser_generation_task,
-                args=(label, merged_schemas_map[label], pdf_text)
-            )
-            generation_thread.start() 
+        # (checagem + criação do lock em um único passo atômico)
+        if REPO.try_acquire_lock(label):
+            logging.info(f"Disparando tarefa de geração de pacote V21 (Híbrido)...")
+            futuro = GEN_POOL.submit(_run_parser_generation_task, label, merged_schemas_map[label], pdf_text)
+            with _GENERATION_LOCK:
+                GEN_FUTURES.append(futuro)
         else:
             logging.warning(f"Geração para '{label}' já em progresso. Pulando.")
 
         # 3. Validação da Heurística (Síncrona)
+        # (uma única passada: contagem de nulos + campos faltantes para o LLM)
         null_count = 0
-        for field in item_schema:
-            if heuristic_data.get(field) is None:
+        campos_faltantes = {}
+        for field, descricao in item_schema.items():
+            valor = heuristic_data.get(field)
+            if valor is None:
                 null_count += 1
+            if not valor:
+                campos_faltantes[field] = descricao
         
         failure_rate = null_count / len(item_schema)
         
@@ -273,23 +407,10 @@ def processar_extracao(label: str,
         # 5. Fallback de LLM Síncrono (Cache Miss) - Hipótese do Usuário
         logging.warning(f"Falha Heurística (Cache Miss) (Taxa: {failure_rate:.0%}). Acionando LLM com timeout...")
         
-        q = Queue()
-        campos_faltantes = {
-            k: v for k, v in item_schema.items() 
-            if k not in heuristic_data or not heuristic_data[k]
-        }
-        
-        llm_thread = threading.Thread(
-            target=_run_llm_extract_missing_in_thread,
-            args=(q, campos_faltantes, pdf_text, heuristic_data) # Passa heuristic_data como contexto
-        )
-        
-        llm_thread.start()
-        
         try:
-            logging.info(f"Tentando extração LLM 'missing' (Cache Miss) com timeout CUMULATIVO de {timeout_budget:.2f}s...")
-            fallback_data = q.get(timeout=timeout_budget)
-            llm_thread.join()
+            logging.info(f"Tentando extração LLM 'missing' (Cache Miss) com timeout de {timeout_budget:.2f}s...")
+            # Passa heuristic_data como contexto; a chamada é encerrada no prazo
+            fallback_data = FALLBACK.extract_missing(campos_faltantes, pdf_text, heuristic_data, timeout=timeout_budget)
             
             if fallback_data:
                 logging.info("Sucesso no Fallback LLM (Cache Miss).")
@@ -297,8 +418,10 @@ def processar_extracao(label: str,
             else:
                 logging.warning("Fallback LLM (Cache Miss) falhou. Retornando dados heurísticos...")
                 
-        except: # (Timeout)
-            logging.critical(f"TIMEOUT CUMULATIVO DE {timeout_budget:.2f}s ATINGIDO (Cache Miss)! Retornando dados heurísticos.")
+        except (APITimeoutError, TimeoutError):
+            logging.critical(f"TIMEOUT DE {timeout_budget:.2f}s ATINGIDO (Cache Miss)! Retornando dados heurísticos.")
+        except Exception as e:
+            logging.error(f"Fallback LLM (Cache Miss) FALHOU: {e}. Retornando dados heurísticos.")
         
         return heuristic_data, (time.time() - start_time_item)
 
@@ -306,54 +429,108 @@ def processar_extracao(label: str,
 # --- (O resto do main.py (V18.1) é idêntico) ---
 #
 
-def processar_batch_serial(batch_data: list, merged_schemas_map: dict):
+def _processar_item(i: int,
+                    item: dict,
+                    total_itens: int,
+                    merged_schemas_map: dict,
+                    jobs: dict,
+                    jobs_lock: threading.Lock
+                    ) -> tuple[dict | None, float, bool]:
     """
-    FASE 3 (V21.1): Processa o batch serialmente e passa os dados de tempo.
+    Processa UM item do lote (executado nas threads de processar_batch_serial).
+
+    'jobs' mapeia a chave do job -> Future do primeiro item com essa chave:
+    itens idênticos esperam por ele em vez de reprocessar o mesmo PDF.
+    O Future guarda (resultado, tempo do item original): um duplicado reporta
+    o tempo do original, não o tempo que passou bloqueado esperando por ele.
+
+    Returns:
+        (resultado ou None se inválido, tempo do item, duplicado?)
     """
-    logging.info("--- FASE 3: Iniciando Processamento Serial do Batch (V21.1) ---")
-    start_time_total = time.time() # O início do LOTE
+    inicio = time.time() # O relógio do item começa antes da leitura do PDF
+    logging.info(f"--- Processando Item {i+1}/{total_itens} ---")
+    job_key, pdf_text = _preparar_item(item)
+
+    job_future = None
+    if job_key:
+        with jobs_lock:
+            original = jobs.get(job_key)
+            if original is None:
+                job_future = jobs[job_key] = Future()
+        if original is not None:
+            # Mesmo PDF, mesmo label e mesmo schema: não há o que reprocessar
+            resultado, tempo_original = original.result()
+            return (dict(resultado) if resultado is not None else None), tempo_original, True
 
-    for i, item in enumerate(batch_data):
-        logging.info(f"--- Processando Item {i+1}/{len(batch_data)} ---")
+    try:
         item_label = item.get("label")
         item_schema = item.get("extraction_schema")
-        pdf_path = item.get("pdf_path")
-        
-        pdf_text = ler_texto_do_pdf(pdf_path) 
-        
         if not all([item_label, item_schema, pdf_text]):
-            logging.error(f"Item {i+1} inválido. Pulando.")
-            continue
-        
-        # Chama a extração passando o índice (i) e o tempo de início do lote
-        resultado, tempo_item = processar_extracao(
-            label=item_label,
-            item_schema=item_schema,
-            pdf_text=pdf_text,
-            merged_schemas_map=merged_schemas_map,
-            item_index=i, # Passa o índice
-            batch_start_time=start_time_total # Passa o tempo de início
-        )
-        
-        tempo_acumulado = time.time() - start_time_total
-        # O limite de tempo para ESTE ponto no lote
-        limite_item_n = (i + 1) * 10.0 
-        
-        logging.info(f"--- Item {i+1} Processado ---")
-        logging.info(f"Dados Finais: {json.dumps(resultado, indent=2, ensure_ascii=False)}")
-        logging.info(f"Tempo do Item: {tempo_item:.2f}s")
-        
-        if tempo_acumulado <= limite_item_n:
-            logging.info(f"Tempo Acumulado: {tempo_acumulado:.2f}s. Limite: {limite_item_n:.2f}s. ... OK.")
+            resultado, tempo_item = None, 0.0
         else:
-            logging.critical(f"Tempo Acumulado: {tempo_acumulado:.2f}s. Limite: {limite_item_n:.2f}s. ... FALHA NO REQUISITO DE TEMPO!")
+            # Chama a extração passando o início do item (deadline próprio)
+            resultado, tempo_item = processar_extracao(
+                label=item_label,
+                item_schema=item_schema,
+                pdf_text=pdf_text,
+                merged_schemas_map=merged_schemas_map,
+                item_start_time=inicio
+            )
+    except BaseException as e:
+        if job_future is not None:
+            job_future.set_exception(e)
+        raise
+
+    if job_future is not None:
+        job_future.set_result((resultado, tempo_item))
+    return resultado, tempo_item, False
+
+def processar_batch_serial(batch_data: list, merged_schemas_map: dict):
+    """
+    FASE 3 (V21.1): Processa o batch e passa os dados de tempo.
+    Os itens rodam em paralelo (BATCH_MAX_WORKERS threads) e cada resultado
+    é reportado assim que fica pronto (as_completed), com o seu próprio tempo.
+    """
+    logging.info(f"--- FASE 3: Iniciando Processamento do Batch (V21.1) com {BATCH_MAX_WORKERS} threads ---")
+    start_time_total = time.time() # O início do LOTE
+    jobs = {} # chave do job -> Future do resultado (deduplicação)
+    jobs_lock = threading.Lock()
+
+    with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="item") as pool:
+        futuros = {
+            pool.submit(_processar_item, i, item, len(batch_data),
+                        merged_schemas_map, jobs, jobs_lock): i
+            for i, item in enumerate(batch_data)
+        }
+
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            resultado, tempo_item, duplicado = futuro.result()
+
+            if duplicado and resultado is not None:
+                logging.info(f"Item {i+1} idêntico a um item já processado. Reutilizando o resultado (e o tempo do item original).")
+            if resultado is None:
+                logging.error(f"Item {i+1} inválido. Pulando.")
+                continue
+            
+            logging.info(f"--- Item {i+1} Processado ---")
+            logging.info(f"Dados Finais: {json.dumps(resultado, ensure_ascii=False)}") # (compacto: uma linha por item)
+            
+            if tempo_item <= ITEM_TIME_LIMIT_SECONDS:
+                logging.info(f"Tempo do Item: {tempo_item:.2f}s. Limite: {ITEM_TIME_LIMIT_SECONDS:.2f}s. ... OK.")
+            else:
+                logging.critical(f"Tempo do Item: {tempo_item:.2f}s. Limite: {ITEM_TIME_LIMIT_SECONDS:.2f}s. ... FALHA NO REQUISITO DE TEMPO!")
 
     logging.info("--- Processamento do Batch Concluído ---")
     tempo_total = time.time() - start_time_total
     logging.info(f"Tempo total para {len(batch_data)} itens: {tempo_total:.2f}s")
     
-    logging.info("Aguardando threads de geração pendentes (se houver)...")
-    # (Resto da sua lógica de thread)
+    with _GENERATION_LOCK:
+        tarefas_geracao = list(GEN_FUTURES)
+    pendentes = sum(1 for f in tarefas_geracao if not f.done())
+    logging.info(f"Aguardando tarefas de geração pendentes: {pendentes} de {len(tarefas_geracao)}...")
+    wait(tarefas_geracao) # Barreira: bloqueia só o tempo necessário
+    logging.info("Tarefas de geração concluídas.")
 
 
 def carregar_dataset(filepath="dataset.json") -> list:
@@ -363,8 +540,12 @@ def carregar_dataset(filepath="dataset.json") -> list:
         logging.error(f"Arquivo do dataset não encontrado em: {filepath}")
         return []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            dataset = json.load(f)
+        if orjson:
+            with open(filepath, 'rb') as f:
+                dataset = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                dataset = json.load(f)
         logging.info(f"Dataset carregado com sucesso. {len(dataset)} itens encontrados.")
         return dataset
     except Exception as e:
@@ -382,4 +563,12 @@ if __name__ == "__main__":
         logging.error("Simulação interrompida. Dataset não pôde ser carregado.")
     else:
         merged_schemas_map = pre_scan_e_mesclar_schemas(batch_data)
+
+        # Parsers já gerados em execuções anteriores vão direto para a memória
+        REPO.preload_all()
+
+        # Compila as Regex heurísticas de todos os schemas antes do lote
+        total_regex = sum(HEURISTIC_FALLBACK.precompile(schema) for schema in merged_schemas_map.values())
+        logging.info(f"Regex heurísticas pré-compiladas: {total_regex}")
+
         processar_batch_serial(batch_data, merged_schemas_map)
\ No newline at end of file
@@ -0,0 +1,55 @@
+# Módulo: openai_client.py
+# (Cliente OpenAI compartilhado: um único pool de conexões HTTP)
+
+import os
+import atexit
+import logging
+import importlib.util
+import httpx
+from functools import lru_cache
+from openai import OpenAI
+from dotenv import load_dotenv
+
+# Opcional (pip install httpx[http2]): habilita HTTP/2 no pool.
+# Só verifica se o pacote existe; quem o importa é o próprio httpx.
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Carrega as variáveis de ambiente (OPENAI_API_KEY)
+load_dotenv()
+
+# Limites do pool de conexões compartilhado (keep-alive entre chamadas)
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+# Contrato padrão das chamadas ao LLM (por requisição). O SDK usa 600s e
+# 2 retentativas por padrão: uma chamada travada prenderia o slot do GEN_POOL.
+# (As chamadas do LLM levam ~10-13s nos logs: 30s dá margem sem travar.)
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_MAX_RETRIES = 1
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    """
+    Retorna o cliente OpenAI único do processo.
+
+    FallbackExtractor e ParserGenerator usam o mesmo cliente e, portanto,
+    o mesmo httpx.Client: a conexão TCP+TLS aberta na primeira chamada
+    é reaproveitada por todas as seguintes (sem novo handshake por item).
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logging.error("OPENAI_API_KEY não encontrada. Verifique seu arquivo .env")
+        raise ValueError("API key da OpenAI não configurada.")
+
+    # Com HTTP/2, as chamadas concorrentes (lote + GEN_POOL) são multiplexadas
+    # sobre a mesma conexão; sem o 'h2', o pool segue em HTTP/1.1 keep-alive.
+    http_client = httpx.Client(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+    # Fecha as conexões keep-alive de forma limpa ao encerrar o processo
+    atexit.register(http_client.close)
+    return OpenAI(api_key=api_key, http_client=http_client)
@@ -1,6 +1,6 @@
 import re
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Callable, List, Tuple
 
 class ParserExecutor:
     """
@@ -11,6 +11,76 @@ class ParserExecutor:
     Esta operação é local, rápida e gratuita.
     """
     
+    def __init__(self):
+        # Parsers já compilados, por identidade do parser (ver compile).
+        # O parser fica guardado junto: o id() não é reciclado enquanto ele viver.
+        self._compiled_cache: Dict[int, Tuple[Dict[str, Optional[str]], List[Tuple[str, Callable[[str], Optional[str]]]]]] = {}
+
+    def _compile_field(self, field_name: str, regex_pattern: Optional[str]) -> Callable[[str], Optional[str]]:
+        """
+        "Compila" o campo em uma função especializada text -> valor.
+        A Regex é compilada UMA vez (com re.DOTALL); os logs de cada
+        caso são os mesmos da execução interpretada.
+        """
+        # 1. Verifica se o Módulo 1 nos deu uma Regex (ou se disse 'null')
+        if not regex_pattern:
+            def null_field(pdf_text: str) -> Optional[str]:
+                logging.warning(f"Campo '{field_name}' não possui Regex (null). Pulando.")
+                return None
+            return null_field
+
+        try:
+            # re.DOTALL é um flag crucial: faz com que o '.' (ponto) 
+            # também corresponda a quebras de linha (\n),
+            # o que é vital para campos multilinha.
+            search = re.compile(regex_pattern, re.DOTALL).search
+        except re.error as e:
+            # 5. Erro Crítico: O LLM gerou uma Regex inválida.
+            error = e # ('e' deixa de existir ao fim do bloco except)
+            def invalid_field(pdf_text: str) -> Optional[str]:
+                logging.error(f"ERRO DE REGEX para '{field_name}': {error} | Pattern: {regex_pattern}")
+                return None
+            return invalid_field
+
+        def field(pdf_text: str) -> Optional[str]:
+            # 2. Executa a Regex
+            match = search(pdf_text)
+            if not match:
+                # 4. Falha: A Regex não encontrou nenhum match no texto.
+                logging.warning(f"Campo '{field_name}' não encontrado no texto.")
+                return None
+            try:
+                # 3. Sucesso: 'match.group(1)' pega o texto do *primeiro* grupo.
+                value = match.group(1)
+            except IndexError:
+                # 6. Erro Crítico: O LLM esqueceu o grupo de captura '()'.
+                logging.error(f"ERRO DE REGEX para '{field_name}': Padrão não possui grupo de captura ().")
+                return None
+            # Limpa espaços em branco extras (grupo vazio vira None)
+            return value.strip() if value else None
+
+        return field
+
+    def compile(self, parser: Dict[str, Optional[str]]) -> List[Tuple[str, Callable[[str], Optional[str]]]]:
+        """
+        Compila o parser inteiro em uma lista (campo, função).
+        O ParserRepository devolve o MESMO dict de parser para um 'label'
+        em todo o lote, então a compilação é memoizada pela identidade do
+        parser: uma consulta O(1) por item. Chamado também logo após salvar
+        um parser novo, para o primeiro Cache Hit já encontrá-lo pronto.
+        """
+        if not parser:
+            return [] # (ex: bundle sem 'parser': um dict novo a cada item, não vai ao cache)
+        entry = self._compiled_cache.get(id(parser))
+        if entry is not None and entry[0] is parser:
+            return entry[1]
+        compiled = [
+            (field_name, self._compile_field(field_name, regex_pattern))
+            for field_name, regex_pattern in parser.items()
+        ]
+        self._compiled_cache[id(parser)] = (parser, compiled)
+        return compiled
+
     def execute_parser(self, parser: Dict[str, Optional[str]], pdf_text: str) -> Dict[str, Optional[str]]:
         """
         Executa cada Regex do parser contra o texto do PDF.
@@ -24,50 +94,13 @@ class ParserExecutor:
             Um dicionário com os dados extraídos.
             Ex: {"nome": "Son Goku", "valor": null}
         """
-        extracted_data = {}
         logging.info("Iniciando Módulo 2: Execução do Parser...")
 
-        for field_name, regex_pattern in parser.items():
-            
-            # 1. Verifica se o Módulo 1 nos deu uma Regex (ou se disse 'null')
-            if not regex_pattern:
-                logging.warning(f"Campo '{field_name}' não possui Regex (null). Pulando.")
-                extracted_data[field_name] = None
-                continue
-
-            try:
-                # 2. Executa a Regex
-                # re.DOTALL é um flag crucial: faz com que o '.' (ponto) 
-                # também corresponda a quebras de linha (\n),
-                # o que é vital para campos multilinha.
-                match = re.search(regex_pattern, pdf_text, re.DOTALL)
-                
-                if match:
-                    # 3. Sucesso: A Regex encontrou um match.
-                    # Nosso prompt pediu por 'grupos de captura ()'.
-                    # 'match.group(1)' pega o texto do *primeiro* grupo.
-                    value = match.group(1)
-                    
-                    if value:
-                        # Limpa espaços em branco extras do início/fim
-                        extracted_data[field_name] = value.strip()
-                    else:
-                        # A Regex deu match, mas o grupo de captura estava vazio
-                        extracted_data[field_name] = None
-                        
-                else:
-                    # 4. Falha: A Regex não encontrou nenhum match no texto.
-                    logging.warning(f"Campo '{field_name}' não encontrado no texto.")
-                    extracted_data[field_name] = None
-                    
-            except re.error as e:
-                # 5. Erro Crítico: O LLM gerou uma Regex inválida.
-                logging.error(f"ERRO DE REGEX para '{field_name}': {e} | Pattern: {regex_pattern}")
-                extracted_data[field_name] = None
-            except IndexError:
-                # 6. Erro Crítico: O LLM esqueceu o grupo de captura '()'.
-                logging.error(f"ERRO DE REGEX para '{field_name}': Padrão não possui grupo de captura ().")
-                extracted_data[field_name] = None
+        # Sem reinterpretar o dict a cada item: usa o parser já compilado
+        extracted_data = {
+            field_name: field(pdf_text)
+            for field_name, field in self.compile(parser)
+        }
 
         logging.info("Módulo 2: Execução do parser concluída.")
-        return extracted_data
\ No newline at end of file
+        return extracted_data
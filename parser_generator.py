@@ -1,13 +1,8 @@
-import os
 import json
 import logging
 import re
-from openai import OpenAI
-from dotenv import load_dotenv
 from typing import Optional
-
-# Carrega as variáveis de ambiente (OPENAI_API_KEY)
-load_dotenv()
+from openai_client import get_openai_client, DEFAULT_TIMEOUT_SECONDS, DEFAULT_MAX_RETRIES
 
 class ParserGenerator:
     """
@@ -18,16 +13,15 @@ class ParserGenerator:
     em vez de gerar Regex "preguiçosas" baseadas nas chaves.
     """
     
-    def __init__(self):
+    def __init__(self,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
         """
         Inicializa o cliente da OpenAI.
         """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            logging.error("OPENAI_API_KEY não encontrada. Verifique seu arquivo .env")
-            raise ValueError("API key da OpenAI não configurada.")
-            
-        self.client = OpenAI(api_key=api_key)
+        # Cliente (e pool de conexões HTTP) compartilhado entre os módulos,
+        # com prazo e retentativas limitados para cada requisição
+        self.client = get_openai_client().with_options(timeout=timeout, max_retries=max_retries)
         self.model = "gpt-5-mini" 
         
     def _build_prompt(self, 
@@ -1,37 +1,88 @@
 import json
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson # Opcional: (de)serialização em C, bem mais rápida que o json
+except ImportError:
+    orjson = None
 
 # Define o diretório padrão
 PARSER_CACHE_DIR = "parser_repository_cache" 
+PARSER_FILE_SUFFIX = ".parser.json"
+
+def _safe_filename(label: str) -> str:
+    """Nome de arquivo seguro para um label (só alfanuméricos, '_' e '-')."""
+    return "".join(c for c in label if c.isalnum() or c in ('_', '-')).rstrip()
 
 class ParserRepository:
     
     def __init__(self, cache_dir=PARSER_CACHE_DIR):
         self.cache_dir = cache_dir
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-            logging.info(f"Repositório de parsers criado em: {self.cache_dir}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logging.debug(f"Repositório de parsers em: {self.cache_dir}")
+        # Parsers já carregados, por nome de arquivo seguro (ver preload_all)
+        self._mem: dict[str, dict] = {}
+        # Locks de geração em andamento (em memória: as gerações rodam
+        # em threads deste processo, não há outro processo a coordenar)
+        self._inflight: set[str] = set()
+        self._inflight_lock = threading.Lock()
 
     def _get_parser_filepath(self, label: str) -> str:
         # ... (resto do código da classe) ...
-        safe_filename = "".join(c for c in label if c.isalnum() or c in ('_', '-')).rstrip()
-        return os.path.join(self.cache_dir, f"{safe_filename}.parser.json")
+        return os.path.join(self.cache_dir, f"{_safe_filename(label)}{PARSER_FILE_SUFFIX}")
+
+    def _load_parser_file(self, filepath: str) -> dict:
+        """ Lê e decodifica um arquivo de parser (levanta erro se corrompido). """
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+
+    def preload_all(self) -> int:
+        """
+        Carrega para a memória todos os parsers do diretório de cache,
+        de uma vez no início do lote. Os itens do lote compartilham labels,
+        então get_parser passa a não tocar no disco para parsers conhecidos.
+        Retorna quantos parsers foram carregados.
+        """
+        nomes = [f for f in os.listdir(self.cache_dir) if f.endswith(PARSER_FILE_SUFFIX)]
+        if not nomes:
+            return 0
+
+        def carregar(nome: str) -> tuple[str, dict | None]:
+            try:
+                return nome, self._load_parser_file(os.path.join(self.cache_dir, nome))
+            except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+                return nome, None # Fica para o get_parser (que registra a corrupção)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(nomes))) as pool:
+            for nome, parser_data in pool.map(carregar, nomes):
+                if parser_data is not None:
+                    self._mem[nome[:-len(PARSER_FILE_SUFFIX)]] = parser_data
+
+        logging.info(f"Repositório de parsers pré-carregado: {len(self._mem)} parsers em memória.")
+        return len(self._mem)
 
     def get_parser(self, label: str) -> dict | None:
         # ... (resto do código da classe) ...
+        parser_data = self._mem.get(_safe_filename(label))
+        if parser_data is not None:
+            logging.info(f"CACHE HIT: Parser encontrado para o label: {label}")
+            return parser_data
+
         filepath = self._get_parser_filepath(label)
         
-        if not os.path.exists(filepath):
+        try:
+            parser_data = self._load_parser_file(filepath)
+            self._mem[_safe_filename(label)] = parser_data
+            logging.info(f"CACHE HIT: Parser encontrado para o label: {label}")
+            return parser_data
+        except FileNotFoundError: # (EAFP: o open já responde se o arquivo existe)
             logging.warning(f"CACHE MISS para o label: {label}")
             return None
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                parser_data = json.load(f)
-                logging.info(f"CACHE HIT: Parser encontrado para o label: {label}")
-                return parser_data
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError): # (orjson.JSONDecodeError herda de json.JSONDecodeError)
             logging.error(f"CORRUPÇÃO: O parser para {label} está mal formatado. Tratando como Cache Miss.")
             return None
 
@@ -40,52 +91,47 @@ class ParserRepository:
         filepath = self._get_parser_filepath(label)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(parser_data, f, indent=2, ensure_ascii=False)
-                logging.info(f"CONHECIMENTO ACUMULADO: Novo parser salvo para o label: {label}")
+            if orjson:
+                data = orjson.dumps(parser_data, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(parser_data, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(filepath, 'wb') as f:
+                f.write(data)
+            self._mem[_safe_filename(label)] = parser_data
+            logging.info(f"CONHECIMENTO ACUMULADO: Novo parser salvo para o label: {label}")
         except IOError as e:
             logging.error(f"Falha ao salvar o parser para {label}: {e}")
 
-    def _get_lock_filepath(self, label: str) -> str:
-        """
-        Gera um nome de arquivo seguro para o 'lock' de um label.
-        Ex: 'parser_repository_cache/carteira_oab.parser.lock'
-        """
-        safe_filename = "".join(c for c in label if c.isalnum() or c in ('_', '-')).rstrip()
-        return os.path.join(self.cache_dir, f"{safe_filename}.parser.lock")
-
     def is_generation_locked(self, label: str) -> bool:
         """
         Verifica se um 'lock' já existe, indicando que a geração
         do parser para este label JÁ ESTÁ EM ANDAMENTO.
         """
-        lock_path = self._get_lock_filepath(label)
-        return os.path.exists(lock_path)
+        with self._inflight_lock:
+            return _safe_filename(label) in self._inflight
 
-    def create_lock(self, label: str):
+    def try_acquire_lock(self, label: str) -> bool:
         """
-        Cria o arquivo .lock para sinalizar que a geração começou.
+        Checagem + criação do 'lock' em um único passo atômico.
+        Retorna True só para quem criou o lock (e deve disparar a geração).
         """
-        lock_path = self._get_lock_filepath(label)
-        try:
-            # Cria um arquivo vazio
-            with open(lock_path, 'w') as f:
-                pass
-            logging.info(f"LOCK CRIADO: Geração do parser para '{label}' iniciada.")
-        except IOError as e:
-            logging.error(f"Falha ao criar lock para '{label}': {e}")
+        key = _safe_filename(label)
+        with self._inflight_lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+        logging.info(f"LOCK CRIADO: Geração do parser para '{label}' iniciada.")
+        return True
 
     def remove_lock(self, label: str):
         """
-        Remove o arquivo .lock após a geração (seja sucesso ou falha).
+        Remove o 'lock' após a geração (seja sucesso ou falha).
         """
-        lock_path = self._get_lock_filepath(label)
-        try:
-            if os.path.exists(lock_path):
-                os.remove(lock_path)
-                logging.info(f"LOCK REMOVIDO: Geração do parser para '{label}' concluída.")
-        except IOError as e:
-            logging.error(f"Falha ao remover lock para '{label}': {e}")
+        with self._inflight_lock:
+            if _safe_filename(label) not in self._inflight:
+                return
+            self._inflight.remove(_safe_filename(label))
+        logging.info(f"LOCK REMOVIDO: Geração do parser para '{label}' concluída.")
 
     def limpar_cache_completo(self):
         """
@@ -93,6 +139,7 @@ class ParserRepository:
         Usado para garantir testes limpos.
         """
         logging.info(f"--- [LIMPEZA] Limpando cache em {self.cache_dir} ---")
+        self._mem.clear()
         try:
             for f_name in os.listdir(self.cache_dir):
                 file_path = os.path.join(self.cache_dir, f_name)
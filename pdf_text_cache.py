@@ -0,0 +1,81 @@
+# Módulo: pdf_text_cache.py
+# (Cache do texto extraído dos PDFs: memória + disco)
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Define o diretório padrão
+PDF_TEXT_CACHE_DIR = "pdf_text_cache"
+
+# Textos mantidos na memória (LRU); os demais continuam no disco
+PDF_TEXT_CACHE_MAX_ENTRIES = 128
+
+class PdfTextCache:
+    """
+    Cache do texto extraído (PyMuPDF) de cada PDF.
+
+    A chave é (caminho, mtime_ns, tamanho, backend) do arquivo: se o PDF for
+    alterado no disco, a chave muda e o texto é extraído de novo.
+    Itens repetidos no lote são servidos da memória; reexecuções do
+    lote são servidas do disco, sem reabrir o PDF com o fitz.
+    A camada de memória é uma LRU limitada a 'max_entries' textos.
+    """
+
+    def __init__(self, cache_dir=PDF_TEXT_CACHE_DIR, max_entries=PDF_TEXT_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._mem: OrderedDict[str, str] = OrderedDict()
+        self._mem_lock = threading.Lock() # As threads do lote consultam juntas
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logging.debug(f"Cache de texto de PDFs em: {self.cache_dir}")
+
+    def get_key(self, pdf_path: str, mtime_ns: int, size: int, backend: str = "fitz") -> str:
+        # O backend entra na chave: cada um extrai um texto ligeiramente diferente
+        return hashlib.sha1(f"{pdf_path}|{mtime_ns}|{size}|{backend}".encode("utf-8")).hexdigest()
+
+    def _get_filepath(self, key: str) -> str:
+        # Ex: 'pdf_text_cache/3f9a...c1.txt'
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def _remember(self, key: str, text: str):
+        with self._mem_lock:
+            self._mem[key] = text
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False) # Descarta o menos usado (segue no disco)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._mem_lock:
+            text = self._mem.get(key)
+            if text is not None:
+                self._mem.move_to_end(key)
+                return text
+        try:
+            with open(self._get_filepath(key), 'r', encoding='utf-8', newline='') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logging.error(f"CORRUPÇÃO: Texto em cache {key} ilegível ({e}). Tratando como Cache Miss.")
+            return None
+        self._remember(key, text)
+        return text
+
+    def save(self, key: str, text: str):
+        """
+        Guarda na memória e grava no disco de forma atômica
+        (arquivo temporário + rename).
+        """
+        self._remember(key, text)
+        filepath = self._get_filepath(key)
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            logging.error(f"Falha ao salvar o texto em cache {key}: {e}")
@@ -0,0 +1,100 @@
+# test_confidence_calculator.py
+# (Plano compilado x _validate_rule: execute com `python -m unittest test_confidence_calculator`)
+
+import logging
+import unittest
+
+from confidence_calculator import ConfidenceCalculator
+
+logging.disable(logging.CRITICAL)
+
+RULES = {
+    "nome": {"type": "string", "min_length": 3, "max_length": 40},
+    "inscricao": {"type": "string", "pattern": r"^\d{6}$", "nullable": False},
+    "uf": {"type": "string", "length": 2},
+    "data": {"type": "date", "format": "dd/mm/yyyy"},
+    "quantidade": {"type": "integer", "minimum": 1},
+    "categoria": {"type": "enum", "values": ["ADVOGADO", "ESTAGIARIO", "SUPLEMENTAR"]},
+    "observacao": {"type": "string"},
+    "regex_invalida": {"type": "string", "pattern": "(", "nullable": True},
+}
+
+VALORES = [
+    {"nome": "Son Goku", "inscricao": "101943", "uf": "PR", "data": "15/03/2024",
+     "quantidade": "5", "categoria": "ADVOGADO", "observacao": "ok", "regex_invalida": None},
+    {"nome": "Go", "inscricao": "10194", "uf": "PRX", "data": "1/3/2024",
+     "quantidade": "0", "categoria": "JUIZ", "observacao": "", "regex_invalida": "x"},
+    {"nome": None, "inscricao": None, "uf": "", "data": "15-03-2024",
+     "quantidade": "abc", "categoria": " advogado ", "observacao": None},
+    {"data": "31/12/199a", "quantidade": "-1", "categoria": "suplementar"},
+    {"data": "15/03/2024 ", "inscricao": "１２３４５６", "quantidade": "²"},
+    {},
+]
+
+THRESHOLDS = [0.0, 0.5, 0.8, 1.0]
+
+
+def score_interpretado(calculator, extracted_data, rules, threshold=0.0):
+    """
+    Referência: o mesmo laço de calculate_confidence, mas validando cada
+    campo pelo caminho interpretado (_validate_rule), com a mesma saída
+    antecipada pelo 'threshold'.
+    """
+    total = len(rules)
+    validated = failed = 0
+    for field_name, rule in rules.items():
+        if calculator._validate_rule(extracted_data.get(field_name), rule):
+            validated += 1
+        else:
+            failed += 1
+            if (total - failed) / total < threshold:
+                break
+    return validated / total
+
+
+class TestPlanoCompilado(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = ConfidenceCalculator()
+
+    def assertMesmoScore(self, extracted_data, rules, threshold):
+        self.assertEqual(
+            self.calculator.calculate_confidence(extracted_data, rules, threshold=threshold),
+            score_interpretado(self.calculator, extracted_data, rules, threshold),
+            (extracted_data, threshold))
+
+    def test_mesmo_score_que_o_caminho_interpretado(self):
+        # Inclui dd/mm/yyyy, enum, regex inválida e a saída antecipada do threshold
+        for threshold in THRESHOLDS:
+            for extracted_data in VALORES:
+                self.assertMesmoScore(extracted_data, RULES, threshold)
+
+    def test_regras_aninhadas_em_validation_rules(self):
+        for extracted_data in VALORES:
+            self.assertEqual(
+                self.calculator.calculate_confidence(extracted_data, {"validation_rules": RULES}),
+                score_interpretado(self.calculator, extracted_data, RULES))
+
+    def test_threshold_interrompe_a_validacao(self):
+        # Dois campos falham: com threshold 1.0 a validação para no primeiro
+        rules = {"a": {"type": "integer"}, "b": {"type": "integer"}, "c": {"type": "integer"}}
+        dados = {"a": "x", "b": "y", "c": "1"}
+        self.assertEqual(self.calculator.calculate_confidence(dados, rules, threshold=1.0), 0.0)
+        self.assertAlmostEqual(self.calculator.calculate_confidence(dados, rules), 1 / 3)
+
+    def test_ruleset_reconstruido_no_mesmo_id(self):
+        dados = {"data": "15/03/2024", "quantidade": "0"}
+        antigo = {"data": {"type": "date", "format": "dd/mm/yyyy"}, "quantidade": {"type": "integer"}}
+        self.calculator.calculate_confidence(dados, antigo)
+        # O cache guarda o próprio ruleset: enquanto a entrada existir, o id() não é reciclado
+        self.assertIs(self.calculator._plan_cache[id(antigo)][0], antigo)
+
+        # Simula o id() reciclado: um ruleset novo encontra a entrada do antigo
+        novo = {"data": {"type": "integer"}, "quantidade": {"type": "integer", "minimum": 1}}
+        self.calculator._plan_cache[id(novo)] = self.calculator._plan_cache.pop(id(antigo))
+        self.assertMesmoScore(dados, novo, 0.0)
+        self.assertIs(self.calculator._plan_cache[id(novo)][0], novo)
+
+
+if __name__ == "__main__":
+    unittest.main()
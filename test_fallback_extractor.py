@@ -0,0 +1,108 @@
+# test_fallback_extractor.py
+# (Prazo das chamadas ao LLM: execute com `python -m unittest test_fallback_extractor`)
+
+import importlib.util
+import logging
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+_DEPS = all(importlib.util.find_spec(m) is not None for m in ("openai", "httpx", "dotenv"))
+
+if _DEPS:
+    import fallback_extractor
+    from fallback_extractor import FallbackExtractor
+
+logging.disable(logging.CRITICAL)
+
+
+class _SlowStream:
+    """Resposta em streaming: 'pedacos' chegam a cada 'intervalo' segundos."""
+
+    def __init__(self, pedacos, intervalo):
+        self.pedacos = pedacos
+        self.intervalo = intervalo
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        for pedaco in self.pedacos:
+            time.sleep(self.intervalo)
+            if self.closed.is_set():
+                return
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=pedaco))])
+
+    def close(self):
+        self.closed.set()
+
+
+class _SlowClient:
+    """Cliente OpenAI falso: cada create() devolve um _SlowStream."""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.streams = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create(self, **kwargs):
+        # 40 pedaços: o JSON só fica completo no último
+        pedacos = ['{"nome": "SON GOKU"'] + [" "] * 38 + ["}"]
+        stream = _SlowStream(pedacos, self.intervalo)
+        self.streams.append(stream)
+        return stream
+
+
+@unittest.skipUnless(_DEPS, "requer openai, httpx e python-dotenv")
+class TestPrazoDoFallback(unittest.TestCase):
+
+    def _extractor(self, client):
+        with mock.patch.object(fallback_extractor, "get_openai_client", return_value=client), \
+             mock.patch.object(fallback_extractor, "ExtractionCache") as cache_cls:
+            cache_cls.return_value.get.return_value = None
+            extractor = FallbackExtractor()
+        extractor.cache = cache_cls.return_value
+        return extractor
+
+    def test_chamada_lenta_retorna_no_prazo_e_encerra_a_requisicao(self):
+        client = _SlowClient(intervalo=0.05) # resposta completa só em ~2s
+        extractor = self._extractor(client)
+
+        inicio = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            extractor.extract_missing({"nome": "Nome"}, "texto", {"cpf": None}, timeout=0.3)
+        self.assertLess(time.monotonic() - inicio, 0.45)
+
+        # A requisição em si é fechada no prazo (sem chamada órfã consumindo tokens)
+        self.assertTrue(client.streams[0].closed.wait(0.3))
+
+    def test_pool_nao_acumula_chamadas_orfas(self):
+        client = _SlowClient(intervalo=0.05)
+        extractor = self._extractor(client)
+
+        def chamada_que_estoura(_):
+            inicio = time.monotonic()
+            try:
+                extractor.extract_missing({"nome": "Nome"}, "texto", {"cpf": None}, timeout=0.2)
+            except TimeoutError:
+                pass
+            return time.monotonic() - inicio
+
+        # 4 threads (como o lote) x 24 chamadas: bem mais que os 8 workers do pool
+        with ThreadPoolExecutor(max_workers=4) as lote:
+            duracoes = list(lote.map(chamada_que_estoura, range(24)))
+        self.assertLess(max(duracoes), 0.35)
+
+        # Logo depois, uma chamada rápida não fica na fila atrás de órfãs
+        client.intervalo = 0.0
+        dados = extractor.extract_missing({"nome": "Nome"}, "texto", {"cpf": None}, timeout=0.5)
+        self.assertEqual(dados, {"nome": "SON GOKU"})
+        self.assertTrue(all(stream.closed.is_set() for stream in client.streams))
+
+
+if __name__ == "__main__":
+    unittest.main()
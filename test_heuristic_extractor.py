@@ -0,0 +1,119 @@
+# test_heuristic_extractor.py
+# (Regressão do _generate_smart_regex e do pré-filtro: execute com `python -m unittest test_heuristic_extractor`)
+
+import logging
+import random
+import unittest
+
+from heuristic_extractor import HeuristicExtractor
+
+logging.disable(logging.CRITICAL)
+
+PDF_TEXT = """SON GOKU
+Nome: SON GOKU
+Inscrição: 101.943
+Seccional - PR
+Situação Regular
+CEP 80010-000
+Data base: 15/03/2024
+Data vencimento 01/02/2023
+"""
+
+
+class TestGenerateSmartRegex(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = HeuristicExtractor()
+
+    def test_campo_de_data_captura_ddmmyyyy(self):
+        # Antes da correção, '\d{2}' virava '\d2' e os campos data_* voltavam None
+        dados = self.extractor.extract(PDF_TEXT, {
+            "data_base": "Data base",
+            "data_vencimento": "Data vencimento",
+        })
+        self.assertEqual(dados, {"data_base": "15/03/2024", "data_vencimento": "01/02/2023"})
+
+    def test_campo_de_data_sem_formato_ddmmyyyy(self):
+        dados = self.extractor.extract("Data base: 2024-03-15\n", {"data_base": "Data base"})
+        self.assertIsNone(dados["data_base"])
+
+    def test_campos_numericos_mantem_as_capturas(self):
+        # Mesmas capturas da Regex anterior à correção das datas
+        dados = self.extractor.extract(PDF_TEXT, {"inscricao": "Inscrição", "cep": "CEP"})
+        self.assertEqual(dados, {"inscricao": "101.943", "cep": "80010-000"})
+
+    def test_campos_genericos_mantem_as_capturas(self):
+        # Mesmas capturas da Regex anterior à correção das datas
+        dados = self.extractor.extract(PDF_TEXT, {
+            "nome": "Nome do profissional",
+            "seccional": "Seccional do profissional",
+            "situacao": "Situação",
+        })
+        self.assertEqual(dados, {"nome": "SON GOKU", "seccional": "PR", "situacao": "Regular"})
+
+
+class TestPrefiltroDePresenca(unittest.TestCase):
+    """
+    O pré-filtro (_fold_case / _is_prefilter_token) pula a Regex quando
+    nenhuma palavra-chave aparece no texto: o resultado deve ser idêntico
+    ao da Regex rodando sempre.
+    """
+
+    SCHEMA = {
+        "nome": "Nome do profissional",
+        "inscricao": "Número de inscrição do profissional",
+        "inscrição": "Inscrição",
+        "subsecao": "Subseção à qual o profissional faz parte",
+        "endereco_profissional": "Endereço profissional completo",
+        "situacao": "Situação do profissional",
+        "data_base": "Data base da operação",
+        "cep": "CEP do endereço",
+    }
+
+    TEXTOS = [
+        "NoMe: son goku\nINSCRIÇÃO: 101943\nsItUaÇãO regular\n",
+        "nome - Son Goku\ninscrição 101943\nSUBSEÇÃO: CURITIBA\n",
+        "NÚMERO DE INSCRIÇÃO DO PROFISSIONAL: 101943\nENDEREÇO PROFISSIONAL COMPLETO: Rua X, 10\n",
+        "número inscrição profissional 101943\nEndereço Profissional: Av. Y\n",
+        "İnscrição: 101943\nınscrıção: 202020\nSİTUAÇÃO REGULAR\n",
+        "DATA BASE DA OPERAÇÃO: 15/03/2024\ncep: 80010-000\n",
+        "Texto sem nenhuma das palavras-chave esperadas\n",
+        "",
+    ]
+
+    def setUp(self):
+        self.com_prefiltro = HeuristicExtractor()
+        self.sem_prefiltro = HeuristicExtractor()
+        # None = campo sem pré-filtro: a Regex roda sempre
+        self.sem_prefiltro._get_presence_tokens = lambda field_name, description: None
+
+    def assertMesmoResultado(self, texto, schema):
+        self.assertEqual(self.com_prefiltro.extract(texto, schema),
+                         self.sem_prefiltro.extract(texto, schema), repr(texto))
+
+    def test_prefiltro_ativo_para_palavras_acentuadas_e_compostas(self):
+        # Garante que os casos abaixo exercitam de fato o pré-filtro
+        for field_name, description in self.SCHEMA.items():
+            self.assertIsNotNone(self.com_prefiltro._get_presence_tokens(field_name, description), field_name)
+
+    def test_mesmo_resultado_com_e_sem_prefiltro(self):
+        for texto in self.TEXTOS:
+            self.assertMesmoResultado(texto, self.SCHEMA)
+
+    def test_palavra_ausente_continua_none(self):
+        dados = self.com_prefiltro.extract("Texto sem nenhuma das palavras-chave\n", self.SCHEMA)
+        self.assertTrue(all(valor is None for valor in dados.values()))
+
+    def test_combinacoes_aleatorias_de_caixa_e_acentos(self):
+        palavras = ("NOME Nome nome nOmE INSCRIÇÃO inscrição Inscricao İnscrição ınscrıção "
+                    "NÚMERO número numero DE do SUBSEÇÃO subseção ENDEREÇO Endereço PROFISSIONAL "
+                    "profissional completo SITUAÇÃO situação DATA base OPERAÇÃO CEP : - "
+                    "15/03/2024 101943 80010-000 regular").split() + ["\n"]
+        rng = random.Random(2024) # Determinístico
+        for _ in range(500):
+            texto = " ".join(rng.choice(palavras) for _ in range(rng.randint(0, 12)))
+            self.assertMesmoResultado(texto, self.SCHEMA)
+
+
+if __name__ == "__main__":
+    unittest.main()
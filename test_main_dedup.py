@@ -0,0 +1,79 @@
+# test_main_dedup.py
+# (Deduplicação de itens idênticos no lote: execute com `python -m unittest test_main_dedup`)
+
+import importlib
+import importlib.util
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+_DEPS = all(importlib.util.find_spec(m) is not None for m in ("fitz", "openai", "httpx", "dotenv"))
+
+
+@unittest.skipUnless(_DEPS, "requer PyMuPDF, openai, httpx e python-dotenv")
+class TestItensDuplicados(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # main.py cria os diretórios de cache no diretório atual ao ser importado
+        cls._tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(cls._tmp.name)
+        try:
+            cls.main = importlib.import_module("main")
+        finally:
+            os.chdir(cwd)
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+        cls._tmp.cleanup()
+
+    def test_itens_identicos_extraidos_uma_vez_com_o_tempo_do_original(self):
+        main = self.main
+        pdf_dir = Path(self._tmp.name) / "files"
+        pdf_dir.mkdir(exist_ok=True)
+        (pdf_dir / "oab_1.pdf").write_bytes(b"%PDF-1.4 conteudo de teste")
+
+        item = {"label": "carteira_oab", "pdf_path": "oab_1.pdf",
+                "extraction_schema": {"nome": "Nome do profissional"}}
+        chamadas = []
+        primeira_chamada = threading.Event()
+
+        def extracao_lenta(label, item_schema, pdf_text, merged_schemas_map, item_start_time):
+            chamadas.append(label)
+            primeira_chamada.set()
+            time.sleep(0.3) # O duplicado fica bloqueado esperando por este item
+            return {"nome": "SON GOKU"}, 0.3
+
+        jobs, jobs_lock = {}, threading.Lock()
+        with mock.patch.object(main, "PDF_DIR", pdf_dir), \
+             mock.patch.object(main, "ler_texto_do_pdf", return_value="Nome: SON GOKU"), \
+             mock.patch.object(main, "processar_extracao", side_effect=extracao_lenta):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                original = pool.submit(main._processar_item, 0, dict(item), 2,
+                                       {}, jobs, jobs_lock)
+                primeira_chamada.wait(1.0) # Garante quem é o original
+                duplicado = pool.submit(main._processar_item, 1, dict(item), 2,
+                                        {}, jobs, jobs_lock)
+                resultado_original, tempo_original, dup_original = original.result()
+                resultado_dup, tempo_dup, dup_dup = duplicado.result()
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(resultado_dup, resultado_original)
+        self.assertIsNot(resultado_dup, resultado_original) # Cópia: o lote pode alterá-lo
+        self.assertFalse(dup_original)
+        self.assertTrue(dup_dup)
+        # O duplicado reporta o tempo do original, não o tempo que passou bloqueado
+        self.assertEqual(tempo_dup, tempo_original)
+
+
+if __name__ == "__main__":
+    unittest.main()
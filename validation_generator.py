@@ -5,6 +5,16 @@ import re
 import logging
 from typing import Optional, Dict, Any
 
+_DATE_RE = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+_CPF_PATTERN = r"^\d{3}\.\d{3}\.\d{3}-\d{2}$"
+_CPF_RE = re.compile(_CPF_PATTERN)
+_CEP_PATTERN = r"^\d{5}-\d{3}$"
+_CEP_RE = re.compile(_CEP_PATTERN)
+_NUMERIC_ID_RE = re.compile(r"^\d+$")
+_MONEY_PATTERN = r"^(R\$|\$)?\s*[\d.,]+$"
+_MONEY_RE = re.compile(_MONEY_PATTERN, re.IGNORECASE)
+_ENUM_RE = re.compile(r"^[A-Z\s'DARC]+$")
+
 class ValidationGenerator:
     """
     Implementa o Gerador de Regras de Validação (V19.2).
@@ -23,28 +33,28 @@ class ValidationGenerator:
             return {"type": "string", "nullable": True}
 
         # Regra 2: Datas (Formato DD/MM/YYYY)
-        if re.match(r"^\d{2}/\d{2}/\d{4}$", value):
+        if _DATE_RE.match(value):
             return {"type": "date", "nullable": False, "format": "dd/mm/yyyy"}
             
         # Regra 3: CPF
-        if re.match(r"^\d{3}\.\d{3}\.\d{3}-\d{2}$", value):
-            return {"type": "string", "nullable": False, "pattern": r"^\d{3}\.\d{3}\.\d{3}-\d{2}$"}
+        if _CPF_RE.match(value):
+            return {"type": "string", "nullable": False, "pattern": _CPF_PATTERN}
             
         # Regra 4: CEP
-        if re.match(r"^\d{5}-\d{3}$", value):
-            return {"type": "string", "nullable": False, "pattern": r"^\d{5}-\d{3}$"}
+        if _CEP_RE.match(value):
+            return {"type": "string", "nullable": False, "pattern": _CEP_PATTERN}
 
         # Regra 5: IDs Numéricos (ex: "101943")
-        if re.match(r"^\d+$", value):
+        if _NUMERIC_ID_RE.match(value):
             length = len(value)
             return {"type": "string", "nullable": False, "pattern": f"^\\d{{{length}}}$"}
 
         # Regra 6: Valores Monetários (ex: "2.372,64")
-        if re.match(r"^(R\$|\$)?\s*[\d.,]+$", value, re.IGNORECASE):
-            return {"type": "string", "nullable": False, "pattern": r"^(R\$|\$)?\s*[\d.,]+$"}
+        if _MONEY_RE.match(value):
+            return {"type": "string", "nullable": False, "pattern": _MONEY_PATTERN}
 
         # Regra 7: Enum/String Curta (ex: "PR" ou "SUPLEMENTAR" ou "CLIENTE")
-        if len(value.split()) < 3 and re.match(r"^[A-Z\s'DARC]+$", value):
+        if len(value.split()) < 3 and _ENUM_RE.match(value):
              return {"type": "enum", "nullable": False, "values": [v.strip() for v in value.split()]}
 
         # Regra 8: Default (String genérica)